@@ -19,13 +19,18 @@
 
 import curses
 import json
-import os
+import re
+from collections import OrderedDict, deque
 
 # ----------------- КОНСТАНТЫ РАЗМЕРОВ -----------------
 INPUT_PANEL_WIDTH = 50   # ширина левой панели (включая рамку)
 INPUT_PANEL_HEIGHT = 12  # высота левой панели (чтобы поместилась история)
 COLOR_DISPLAY_WIDTH = 20 # ширина правой панели (включая рамку)
 COLOR_DISPLAY_HEIGHT = 12 # высота правой панели (включая рамку)
+COLOR_INNER_WIDTH = COLOR_DISPLAY_WIDTH - 2    # ширина цветного прямоугольника
+COLOR_INNER_HEIGHT = COLOR_DISPLAY_HEIGHT - 2  # высота цветного прямоугольника
+BLANK_ROW = " " * COLOR_INNER_WIDTH            # строка заливки прямоугольника
+HASH_ROW = "#" * COLOR_INNER_WIDTH             # запасная заливка, если цветной атрибут не вывести
 
 # ----------------- ПРОЧИЕ КОНСТАНТЫ -----------------
 HISTORY_MAX = 200
@@ -34,6 +39,13 @@ HISTORY_FILENAME = "colors_history.json"
 INDENT_X = 2
 INDENT_Y = 1
 
+# ----------------- СТАТИЧЕСКИЕ СТРОКИ ЛЕВОЙ ПАНЕЛИ -----------------
+PROMPT = "Введите hex (#rrggbb) или R G B (0-1000):"
+INPUT_LABEL = "Ввод: "
+MAX_INPUT_LEN = INPUT_PANEL_WIDTH - INDENT_X - len(INPUT_LABEL) - 4  # видимая длина поля ввода
+MAX_MSG = INPUT_PANEL_WIDTH - 4   # максимальная длина строки сообщения
+MAX_HIST = INPUT_PANEL_WIDTH - 4  # максимальная длина строки истории
+
 # Если True — PageUp и PageDown поменяны местами (по желанию пользователя)
 SWAP_PAGE_KEYS = True
 
@@ -44,21 +56,35 @@ try:
 except Exception:
     CLIP_AVAILABLE = False
 
+# реализация копирования выбирается один раз при импорте — в обработчике клавиши нет ветвления
+if CLIP_AVAILABLE:
+    def copy_to_clipboard(text):
+        try:
+            pyperclip.copy(text)
+            return True, f"Скопировано: {text}"
+        except Exception as e:
+            return False, f"Ошибка копирования: {e}"
+else:
+    def copy_to_clipboard(text):
+        return False, "pyperclip не установлен — установить: pip install pyperclip"
+
 # ----------------- УТИЛИТЫ -----------------
-def hex_to_1000(hex_color: str):
-    hex_color = hex_color.lstrip("#")
-    if len(hex_color) != 6:
-        raise ValueError("HEX должен быть в формате #rrggbb")
-    try:
-        r = int(hex_color[0:2], 16)
-        g = int(hex_color[2:4], 16)
-        b = int(hex_color[4:6], 16)
-    except ValueError:
+# Байт канала (0-255) -> значение для init_color (0-1000); всего 256 вариантов
+BYTE_TO_1000 = tuple(round(i / 255 * 1000) for i in range(256))
+HEX_RE = re.compile(r"#?([0-9a-fA-F]{6})")
+
+def hex_to_rgb(hex_color: str):
+    m = HEX_RE.fullmatch(hex_color)
+    if not m:
+        if len(hex_color.lstrip("#")) != 6:
+            raise ValueError("HEX должен быть в формате #rrggbb")
         raise ValueError("Недопустимые символы в HEX")
-    r_1000 = round(r / 255 * 1000)
-    g_1000 = round(g / 255 * 1000)
-    b_1000 = round(b / 255 * 1000)
-    return r_1000, g_1000, b_1000
+    raw = bytes.fromhex(m.group(1))
+    return raw[0], raw[1], raw[2]
+
+def hex_to_1000(hex_color: str):
+    r, g, b = hex_to_rgb(hex_color)
+    return BYTE_TO_1000[r], BYTE_TO_1000[g], BYTE_TO_1000[b]
 
 def rgb1000_to_hex(r: int, g: int, b: int):
     if not (0 <= r <= 1000 and 0 <= g <= 1000 and 0 <= b <= 1000):
@@ -68,30 +94,33 @@ def rgb1000_to_hex(r: int, g: int, b: int):
     b_255 = round(b / 1000 * 255)
     return f"#{r_255:02x}{g_255:02x}{b_255:02x}"
 
+def history_line(hex_color):
+    # строка истории без маркера выбора; маркер '>' накладывается поверх при отрисовке
+    return f"  {hex_color}"[:MAX_HIST]
+
 def save_history_to_file(history, filename=HISTORY_FILENAME):
     try:
         with open(filename, "w", encoding="utf-8") as f:
-            json.dump(history, f, ensure_ascii=False, indent=2)
+            json.dump(history, f, separators=(",", ":"))  # компактно: без отступов и пробелов
         return True, f"История сохранена в {filename}"
     except Exception as e:
         return False, f"Ошибка сохранения: {e}"
 
 def load_history_from_file(filename=HISTORY_FILENAME):
-    if not os.path.exists(filename):
-        return [], f"Файл {filename} не найден"
     try:
         with open(filename, "r", encoding="utf-8") as f:
             data = json.load(f)
         if not isinstance(data, list):
             return [], "Неверный формат файла истории"
         return data[:HISTORY_MAX], f"История загружена из {filename}"
+    except FileNotFoundError:
+        return [], f"Файл {filename} не найден"
     except Exception as e:
         return [], f"Ошибка загрузки: {e}"
 
 # ----------------- ОСНОВНАЯ ФУНКЦИЯ CURSES -----------------
 def main(stdscr):
     curses.curs_set(1)
-    stdscr.nodelay(True)
     stdscr.keypad(True)
 
     # Проверка цвета
@@ -110,136 +139,249 @@ def main(stdscr):
     curses.init_pair(3, curses.COLOR_GREEN, -1)   # успех
     curses.init_pair(4, curses.COLOR_BLACK, curses.COLOR_WHITE) # вспомогательная
 
+    # атрибуты пар вычисляем один раз, а не на каждой перерисовке
+    cp1 = curses.color_pair(1)
+    cp2 = curses.color_pair(2)
+    cp3 = curses.color_pair(3)
+
     # окна
     input_win = curses.newwin(INPUT_PANEL_HEIGHT, INPUT_PANEL_WIDTH, 0, 0)
     color_win = curses.newwin(COLOR_DISPLAY_HEIGHT, COLOR_DISPLAY_WIDTH, 0, INPUT_PANEL_WIDTH + 1)
+    addstr = input_win.addstr  # кэш bound-метода для горячих участков
 
     # состояние
     current_input = ""
-    message = ""
-    message_attr = curses.color_pair(1)
+    message_display = ""  # сообщение, уже обрезанное до MAX_MSG
+    message_attr = cp1
     last_hex = None  # последний успешно вычисленный hex
-    history = []     # список hex-строк, последние первыми (0 — newest)
+    history = deque(maxlen=HISTORY_MAX)  # hex-строки, последние первыми (0 — newest)
     history_index = None  # индекс в истории при навигации (None если не в навигации)
     history_view_start = 0  # индекс первого показываемого элемента в истории (0 = самый новый)
-    use_custom_color_id = 100  # ID для init_color
     can_change_colors = curses.can_change_color()
+    # кэш (r, g, b) -> атрибут пары (LRU: недавно использованные в конце), чтобы не
+    # вызывать init_color/init_pair/color_pair повторно для уже виденных цветов;
+    # ключ — значения каналов, а не строка, так что #FF0000 и #ff0000 делят один слот
+    color_pair_cache = OrderedDict()
+    next_color_id = 100  # следующий свободный ID для init_color
+    color_id_limit = min(curses.COLORS, curses.COLOR_PAIRS)  # ID должен быть меньше обоих
+
+    # без init_color — две фиксированные контрастные пары, инициализируем один раз
+    light_attr = dark_attr = cp1
+    if not can_change_colors:
+        try:
+            curses.init_pair(200, curses.COLOR_BLACK, curses.COLOR_WHITE)
+            light_attr = curses.color_pair(200)
+        except Exception:
+            pass
+        try:
+            curses.init_pair(201, curses.COLOR_WHITE, curses.COLOR_BLACK)
+            dark_attr = curses.color_pair(201)
+        except Exception:
+            pass
+    # hex, которым сейчас залит прямоугольник (None — не залит): повтор того же цвета
+    # ничего не перерисовывает, а для смены цвета хватает chgat
+    drawn_hex = None
+    needs_update = True   # виртуальный экран изменился — нужен doupdate()
 
     # вспомог: отрисовать панель цвета
     def draw_color_panel(hex_color_str):
-        nonlocal color_win, last_hex
-        color_win.erase()
-        color_win.box()
+        nonlocal color_win, last_hex, drawn_hex, next_color_id, needs_update
+        if hex_color_str and hex_color_str == drawn_hex:
+            return
+        needs_update = True
         if not hex_color_str:
+            color_win.erase()
+            color_win.box()
             label = "No color"
-            color_win.addstr(COLOR_DISPLAY_HEIGHT//2, max(1, (COLOR_DISPLAY_WIDTH - len(label))//2), label, curses.color_pair(1))
+            color_win.addstr(COLOR_DISPLAY_HEIGHT//2, max(1, (COLOR_DISPLAY_WIDTH - len(label))//2), label, cp1)
+            drawn_hex = None
             color_win.noutrefresh()
             return
 
         try:
-            r_1000, g_1000, b_1000 = hex_to_1000(hex_color_str)
+            r, g, b = hex_to_rgb(hex_color_str)
             if can_change_colors:
+                rgb = (r, g, b)
                 try:
-                    curses.init_color(use_custom_color_id, r_1000, g_1000, b_1000)
-                    curses.init_pair(use_custom_color_id, curses.COLOR_BLACK, use_custom_color_id)
-                    pair_attr = curses.color_pair(use_custom_color_id)
+                    pair_attr = color_pair_cache.get(rgb)
+                    if pair_attr is not None:
+                        color_pair_cache.move_to_end(rgb)
+                    else:
+                        if next_color_id < color_id_limit:
+                            color_id = next_color_id
+                        else:
+                            # свободных ID нет — забираем ID давно не использованного цвета
+                            _, evicted_attr = color_pair_cache.popitem(last=False)
+                            color_id = curses.pair_number(evicted_attr)
+                        # промах кэша: такого (r, g, b) нет ни в одном слоте, палитру обновлять нужно
+                        curses.init_color(color_id, BYTE_TO_1000[r], BYTE_TO_1000[g], BYTE_TO_1000[b])
+                        if color_id == next_color_id:
+                            # пара «чёрный на color_id» для ID не меняется — задаём её один раз
+                            curses.init_pair(color_id, curses.COLOR_BLACK, color_id)
+                            next_color_id += 1
+                        pair_attr = curses.color_pair(color_id)
+                        color_pair_cache[rgb] = pair_attr
                 except Exception:
-                    pair_attr = curses.color_pair(1)
+                    pair_attr = cp1
             else:
-                r = round(int(hex_color_str[1:3], 16))
-                g = round(int(hex_color_str[3:5], 16))
-                b = round(int(hex_color_str[5:7], 16))
-                avg = (r + g + b) / 3
-                if avg > 200:
-                    try:
-                        curses.init_pair(200, curses.COLOR_BLACK, curses.COLOR_WHITE)
-                        pair_attr = curses.color_pair(200)
-                    except Exception:
-                        pair_attr = curses.color_pair(1)
-                else:
+                # светлый цвет: среднее по каналам > 200, т.е. сумма > 600 (без деления)
+                pair_attr = light_attr if r + g + b > 600 else dark_attr
+
+            if drawn_hex is not None:
+                # геометрия не меняется — только перекрашиваем уже залитые строки
+                for y in range(COLOR_INNER_HEIGHT):
+                    color_win.chgat(1 + y, 1, COLOR_INNER_WIDTH, pair_attr)
+                drawn_hex = hex_color_str
+            else:
+                color_win.erase()
+                color_win.box()
+                drawn_hex = hex_color_str
+                for y in range(COLOR_INNER_HEIGHT):
                     try:
-                        curses.init_pair(201, curses.COLOR_WHITE, curses.COLOR_BLACK)
-                        pair_attr = curses.color_pair(201)
+                        color_win.addstr(1 + y, 1, BLANK_ROW, pair_attr)
                     except Exception:
-                        pair_attr = curses.color_pair(1)
-
-            inner_h = COLOR_DISPLAY_HEIGHT - 2
-            inner_w = COLOR_DISPLAY_WIDTH - 2
-            for y in range(inner_h):
-                try:
-                    color_win.addstr(1 + y, 1, " " * inner_w, pair_attr)
-                except Exception:
-                    color_win.addstr(1 + y, 1, "#" * inner_w, curses.color_pair(1))
+                        color_win.addstr(1 + y, 1, HASH_ROW, cp1)
+                        drawn_hex = None
         except Exception as e:
-            color_win.addstr(1, 1, f"Ошибка цвета: {e}", curses.color_pair(2))
+            color_win.erase()
+            color_win.box()
+            color_win.addstr(1, 1, f"Ошибка цвета: {e}", cp2)
+            drawn_hex = None
 
         color_win.noutrefresh()
 
-    # начальная отрисовка
-    draw_color_panel(None)
-
-    while True:
-        # отрисовываем левую панель
+    # геометрия левой панели
+    input_x = INDENT_X + len(INPUT_LABEL)
+    blank_input = " " * MAX_INPUT_LEN
+    blank_line = " " * MAX_MSG
+    hist_start_y = INDENT_Y + 7
+    available_lines = INPUT_PANEL_HEIGHT - hist_start_y - 1
+
+    # история целиком живёт в pad; прокрутка — это только другой prefresh
+    # (+1 строка: запись в последнюю ячейку pad даёт ошибку, а insertln есть куда вытеснить)
+    hist_pad = curses.newpad(HISTORY_MAX + 1, MAX_HIST)
+    win_y, win_x = input_win.getbegyx()
+    hist_abs_y = win_y + hist_start_y
+    hist_abs_x = win_x + INDENT_X
+    marked_row = None  # строка pad, в которой сейчас стоит маркер '>'
+
+    # вспомог: отрисовка частей левой панели (перерисовываются только изменившиеся)
+    def redraw_prompt():
         input_win.erase()
         input_win.box()
-        input_win.addstr(INDENT_Y, INDENT_X, "Введите hex (#rrggbb) или R G B (0-1000):", curses.color_pair(1))
-        input_win.addstr(INDENT_Y + 1, INDENT_X, "", curses.color_pair(1))
-
-        # поле ввода
-        input_label = "Ввод: "
-        input_win.addstr(INDENT_Y + 3, INDENT_X, input_label, curses.color_pair(1))
-        max_input_len = INPUT_PANEL_WIDTH - INDENT_X - len(input_label) - 4
-        display_input = current_input[-max_input_len:]
-        input_win.addstr(INDENT_Y + 3, INDENT_X + len(input_label), display_input, curses.color_pair(1))
-
-        # сообщение под вводом
-        input_win.addstr(INDENT_Y + 5, INDENT_X, message[:INPUT_PANEL_WIDTH - 4], message_attr)
-
-        # отобразим историю под сообщением (ограничено высотой окна)
-        hist_start_y = INDENT_Y + 7
-        available_lines = INPUT_PANEL_HEIGHT - hist_start_y - 1
-        input_win.addstr(hist_start_y - 1, INDENT_X, "", curses.color_pair(1))
+        addstr(INDENT_Y, INDENT_X, PROMPT, cp1)
+        addstr(INDENT_Y + 3, INDENT_X, INPUT_LABEL, cp1)
+
+    def redraw_input_field():
+        display_input = current_input[-MAX_INPUT_LEN:]
+        addstr(INDENT_Y + 3, input_x, blank_input, cp1)
+        addstr(INDENT_Y + 3, input_x, display_input, cp1)
+        return display_input
+
+    def redraw_message():
+        addstr(INDENT_Y + 5, INDENT_X, blank_line, cp1)
+        addstr(INDENT_Y + 5, INDENT_X, message_display, message_attr)
+
+    # вспомог: сменить сообщение (обрезка делается один раз — при записи)
+    def set_message(text, attr):
+        nonlocal message_display, message_attr, message_dirty
+        text = text[:MAX_MSG]
+        if text == message_display and attr == message_attr:
+            return
+        message_display = text
+        message_attr = attr
+        message_dirty = True
 
+    def redraw_history():
+        nonlocal history_view_start
         # корректируем границы view_start
         if history_view_start < 0:
             history_view_start = 0
         if history_view_start > max(0, len(history) - available_lines):
             history_view_start = max(0, len(history) - available_lines)
 
-        # берем срез для отображения
-        to_show = history[history_view_start:history_view_start + available_lines]
-        for i, hexv in enumerate(to_show):
-            abs_idx = history_view_start + i  # абсолютный индекс в history (0 — newest)
-            marker = " "
-            if history_index is not None and history_index == abs_idx:
-                marker = ">"
-            line = f"{marker} {hexv}"
-            input_win.addstr(hist_start_y + i, INDENT_X, line[:INPUT_PANEL_WIDTH - 4], curses.color_pair(1))
-
-        input_win.noutrefresh()
-
-        # позиция курсора: вычисляем абсолютные координаты на экране
-        win_y, win_x = input_win.getbegyx()
-        cursor_x = INDENT_X + len(input_label) + len(display_input)
-        cursor_y = INDENT_Y + 3
-        abs_cursor_y = win_y + cursor_y
-        abs_cursor_x = win_x + cursor_x
-        try:
-            # ставим курсор в stdscr (абсолютные координаты) — чтобы мигание и ввод совпадали
-            stdscr.move(abs_cursor_y, abs_cursor_x)
-        except Exception:
-            # fallback: если ошибка — используем move окна
+        mark_history_row(history_index)
+        hist_pad.noutrefresh(history_view_start, 0,
+                             hist_abs_y, hist_abs_x,
+                             hist_abs_y + available_lines - 1, hist_abs_x + MAX_HIST - 1)
+
+    # вспомог: маркер выбранного элемента (индекс в history совпадает со строкой pad)
+    def mark_history_row(index):
+        nonlocal marked_row
+        if index == marked_row:
+            return
+        if marked_row is not None:
+            hist_pad.addch(marked_row, 0, ord(" "), cp1)
+        if index is not None:
+            hist_pad.addch(index, 0, ord(">"), cp1)
+        marked_row = index
+
+    # вспомог: новый элемент в начало истории — сдвигаем строки pad вниз средствами curses
+    def push_history_line(hex_color):
+        mark_history_row(None)
+        hist_pad.move(0, 0)
+        hist_pad.insertln()
+        hist_pad.addstr(0, 0, history_line(hex_color), cp1)
+
+    # вспомог: полная перезапись pad (после загрузки / очистки истории)
+    def rebuild_history_pad():
+        nonlocal marked_row
+        hist_pad.erase()
+        marked_row = None
+        for i, hexv in enumerate(history):
+            hist_pad.addstr(i, 0, history_line(hexv), cp1)
+
+    # начальная отрисовка; stdscr обновляем один раз, иначе неявный refresh в getch()
+    # затрёт окна, которые теперь перерисовываются не целиком
+    stdscr.noutrefresh()
+    draw_color_panel(None)
+    redraw_prompt()
+
+    # флаги «грязных» участков: перерисовываем только то, что изменилось
+    input_dirty = True     # поле ввода
+    message_dirty = True   # строка сообщения
+    history_dirty = True   # содержимое истории
+    view_dirty = True      # прокрутка / выделение в истории
+    display_input = ""
+
+    while True:
+        if input_dirty or message_dirty or history_dirty or view_dirty:
+            if input_dirty:
+                display_input = redraw_input_field()
+            if message_dirty:
+                redraw_message()
+            input_win.noutrefresh()
+            # pad выводится поверх input_win, поэтому после него
+            if history_dirty or view_dirty:
+                redraw_history()
+            input_dirty = message_dirty = history_dirty = view_dirty = False
+            needs_update = True
+
+        # клавиши, которые ничего не изменили, не тратят время на doupdate()
+        if needs_update:
+            # позиция курсора: вычисляем абсолютные координаты на экране
+            cursor_x = input_x + len(display_input)
+            cursor_y = INDENT_Y + 3
+            abs_cursor_y = win_y + cursor_y
+            abs_cursor_x = win_x + cursor_x
             try:
-                input_win.move(cursor_y, cursor_x)
+                # ставим курсор в stdscr (абсолютные координаты) — чтобы мигание и ввод совпадали;
+                # noutrefresh сбрасывает флаг перемещения, иначе getch() сделает ещё один refresh
+                stdscr.move(abs_cursor_y, abs_cursor_x)
+                stdscr.noutrefresh()
             except Exception:
-                pass
+                # fallback: если ошибка — используем move окна
+                try:
+                    input_win.move(cursor_y, cursor_x)
+                except Exception:
+                    pass
 
-        curses.doupdate()
+            curses.doupdate()
+            needs_update = False
 
         try:
+            # блокирующее чтение: процесс спит до нажатия клавиши
             key = stdscr.getch()
-            if key == -1:
-                continue
 
             # Выход
             if key == 27:  # ESC
@@ -248,18 +390,16 @@ def main(stdscr):
             # Enter
             if key in (curses.KEY_ENTER, 10, 13):
                 if not current_input.strip():
-                    message = "Ввод пустой"
-                    message_attr = curses.color_pair(2)
+                    set_message("Ввод пустой", cp2)
                     continue
 
                 try:
                     # определяем формат ввода
                     if current_input.strip().startswith("#"):
                         hex_color_str = current_input.strip()
-                        _ = hex_to_1000(hex_color_str)
                         # Для HEX показываем RGB значения
                         r, g, b = hex_to_1000(hex_color_str)
-                        message = f"HEX: {hex_color_str} -> RGB: {r} {g} {b}"
+                        result = f"HEX: {hex_color_str} -> RGB: {r} {g} {b}"
                     else:
                         parts = list(map(int, current_input.strip().split()))
                         if len(parts) != 3:
@@ -267,30 +407,33 @@ def main(stdscr):
                         r, g, b = parts
                         hex_color_str = rgb1000_to_hex(r, g, b)
                         # Для RGB показываем HEX значение
-                        message = f"RGB: {r} {g} {b} -> HEX: {hex_color_str}"
+                        result = f"RGB: {r} {g} {b} -> HEX: {hex_color_str}"
 
                     last_hex = hex_color_str
                     if not history or history[0] != hex_color_str:
-                        history.insert(0, hex_color_str)
-                    # урезаем историю
-                    history = history[:HISTORY_MAX]
+                        # deque(maxlen) сам отбрасывает самые старые элементы
+                        history.appendleft(hex_color_str)
+                        push_history_line(hex_color_str)
                     # сбрасываем навигацию и подстраиваем view чтобы показать первый элемент
                     history_index = None
                     history_view_start = 0
-                    message_attr = curses.color_pair(3)
+                    history_dirty = True
+                    set_message(result, cp3)
                     draw_color_panel(hex_color_str)
                 except Exception as e:
-                    message = f"Ошибка: {e}"
-                    message_attr = curses.color_pair(2)
+                    set_message(f"Ошибка: {e}", cp2)
                 finally:
                     current_input = ""
+                    input_dirty = True
 
             # Backspace
             elif key in (curses.KEY_BACKSPACE, 127, 8):
-                current_input = current_input[:-1]
+                if current_input:
+                    current_input = current_input[:-1]
+                    input_dirty = True
+                view_dirty = view_dirty or history_index is not None
                 history_index = None
-                message = ""
-                message_attr = curses.color_pair(1)
+                set_message("", cp1)
 
             # Навигация по истории стрелками
             elif key == curses.KEY_DOWN:
@@ -306,6 +449,8 @@ def main(stdscr):
                         history_view_start = history_index
                     if history_index >= history_view_start + available_lines:
                         history_view_start = history_index - available_lines + 1
+                    input_dirty = True
+                    view_dirty = True
                     # обновляем правую панель цвета
                     draw_color_panel(history[history_index])
 
@@ -319,6 +464,8 @@ def main(stdscr):
                         if history_index < 0:
                             history_index = None
                             current_input = ""
+                            input_dirty = True
+                            view_dirty = True
                             # очищаем правую панель цвета
                             draw_color_panel(None)
                         else:
@@ -327,6 +474,8 @@ def main(stdscr):
                                 history_view_start = history_index
                             if history_index >= history_view_start + available_lines:
                                 history_view_start = history_index - available_lines + 1
+                            input_dirty = True
+                            view_dirty = True
                             # обновляем правую панель цвета
                             draw_color_panel(history[history_index])
 
@@ -354,6 +503,7 @@ def main(stdscr):
                 new_start = history_view_start + direction * step
                 # ограничение
                 new_start = max(0, min(new_start, max(0, len(history) - available_lines)))
+                view_dirty = view_dirty or new_start != history_view_start
                 history_view_start = new_start
                 # при скролле снимаем текущий выбор (но можно оставить — решаем снять)
                 #history_index = None
@@ -371,34 +521,24 @@ def main(stdscr):
                     if current_input.strip().startswith("#"):
                         to_copy = current_input.strip()
                 if to_copy:
-                    if CLIP_AVAILABLE:
-                        try:
-                            pyperclip.copy(to_copy)
-                            message = f"Скопировано: {to_copy}"
-                            message_attr = curses.color_pair(3)
-                        except Exception as e:
-                            message = f"Ошибка копирования: {e}"
-                            message_attr = curses.color_pair(2)
-                    else:
-                        message = "pyperclip не установлен — установить: pip install pyperclip"
-                        message_attr = curses.color_pair(2)
+                    ok, msg = copy_to_clipboard(to_copy)
+                    set_message(msg, cp3 if ok else cp2)
                 else:
-                    message = "Нет HEX для копирования"
-                    message_attr = curses.color_pair(2)
+                    set_message("Нет HEX для копирования", cp2)
 
             elif key == ord('s'):  # сохранить историю в файл
-                ok, msg = save_history_to_file(history, HISTORY_FILENAME)
-                message = msg
-                message_attr = curses.color_pair(3) if ok else curses.color_pair(2)
+                ok, msg = save_history_to_file(list(history), HISTORY_FILENAME)
+                set_message(msg, cp3 if ok else cp2)
 
             elif key == ord('l'):  # загрузить историю из файла
                 loaded, msg = load_history_from_file(HISTORY_FILENAME)
                 if loaded:
-                    history = loaded[:HISTORY_MAX]
+                    history = deque(loaded, maxlen=HISTORY_MAX)
+                    rebuild_history_pad()
                     history_index = None
                     history_view_start = 0
-                    message = msg
-                    message_attr = curses.color_pair(3)
+                    history_dirty = True
+                    set_message(msg, cp3)
                     # Если есть элементы в истории, показываем цвет первого элемента
                     if history:
                         draw_color_panel(history[0])
@@ -406,15 +546,15 @@ def main(stdscr):
                         # Если история пуста, очищаем правую панель
                         draw_color_panel(None)
                 else:
-                    message = msg
-                    message_attr = curses.color_pair(2)
+                    set_message(msg, cp2)
 
             elif key == ord('C'):  # очистить историю (Shift+C)
-                history = []
+                history.clear()
+                rebuild_history_pad()
                 history_index = None
                 history_view_start = 0
-                message = "История очищена"
-                message_attr = curses.color_pair(3)
+                history_dirty = True
+                set_message("История очищена", cp3)
                 # Очищаем правую панель цвета
                 draw_color_panel(None)
 
@@ -422,19 +562,19 @@ def main(stdscr):
             else:
                 if 32 <= key <= 126:
                     current_input += chr(key)
+                    view_dirty = view_dirty or history_index is not None
                     history_index = None
-                    message = ""
-                    message_attr = curses.color_pair(1)
+                    set_message("", cp1)
+                    input_dirty = True
 
         except Exception as e:
-            message = f"Global error: {e}"
-            message_attr = curses.color_pair(2)
+            set_message(f"Global error: {e}", cp2)
             current_input = ""
+            input_dirty = True
 
     # завершающие настройки
     curses.curs_set(1)
     stdscr.keypad(False)
-    stdscr.nodelay(False)
 
 if __name__ == "__main__":
     curses.wrapper(main)